@@ -1,10 +1,14 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import functools
+import math
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from scipy.optimize import curve_fit
-from scipy.interpolate import make_lsq_spline
-from scipy import integrate
+from scipy.interpolate import PPoly, make_lsq_spline
+
+GAUSS_LEGENDRE_NODES, GAUSS_LEGENDRE_WEIGHTS = np.polynomial.legendre.leggauss(8)
 
 
 def estimate_gt_e_and_r0(arclength_parameters, thicknesses):
@@ -26,20 +30,107 @@ def estimate_gt_e_and_r0(arclength_parameters, thicknesses):
     r0:
         initial tube thickness $r_0$
     """
-    sol, cov = curve_fit(lambda l, r0, e: e * l + r0, arclength_parameters, thicknesses)
-    r0, e = sol
+    # the thickness is affine in the arclength, so the least-squares fit
+    # has a closed form and needs no iterative optimization
+    e, r0 = np.polyfit(arclength_parameters, thicknesses, 1)
     return e, r0
 
 
 def gen_knots(start, end, num, rep):
-    start_rep = np.repeat(start, rep - 1)
-    knots = np.linspace(start, end, num)
-    end_rep = np.repeat(end, rep - 1)
-    knots = np.append(start_rep, knots)
-    knots = np.append(knots, end_rep)
+    knots = np.empty(num + 2 * (rep - 1))
+    knots[: rep - 1] = start
+    knots[rep - 1 : rep - 1 + num] = np.linspace(start, end, num)
+    knots[rep - 1 + num :] = end
     return knots
 
 
+def _bspline_to_ppoly(b):
+    """Convert a B-spline curve into a piecewise polynomial in the power basis.
+
+    The Taylor coefficients on each knot span are obtained
+    by evaluating all derivatives of the B-spline at the left ends of the spans.
+
+    Parameters
+    =============
+    b: BSpline
+        B-spline curve of the degree k with knots t.
+
+    Returns
+    =============
+    pp: PPoly
+        piecewise polynomial with breakpoints t
+    """
+    t, k = b.t, b.k
+    c = np.stack([b(t[:-1], nu=m) / math.factorial(m) for m in range(k, -1, -1)])
+    return PPoly.construct_fast(c, t)
+
+
+def _integrate_speed_on_intervals(db, lower, upper):
+    """Integrate the speed ||db(l)|| on each interval [lower, upper]
+    by the Gauss-Legendre quadrature, evaluating db on all nodes at once.
+    """
+    half_widths = 0.5 * (upper - lower)
+    midpoints = 0.5 * (upper + lower)
+    nodes = (
+        half_widths[:, np.newaxis] * GAUSS_LEGENDRE_NODES + midpoints[:, np.newaxis]
+    ).reshape(-1)
+    derivatives = db(nodes).reshape(nodes.size, -1)
+    speeds = np.linalg.norm(derivatives, axis=1).reshape(
+        -1, GAUSS_LEGENDRE_NODES.size
+    )
+    return half_widths * (speeds @ GAUSS_LEGENDRE_WEIGHTS)
+
+
+def _integrate_speed(db, knots, rtol=10 ** (-10), max_level=10):
+    """Integrate the speed ||db(l)|| over the knot spans
+    by the adaptive Gauss-Legendre quadrature.
+
+    Each span is bisected until the integrals over it and over its halves agree
+    within rtol, so that only the spans where the speed is not smooth are refined.
+
+    Parameters
+    =============
+    db: callable
+        derivative of a B-spline curve
+    knots: 1D array-like
+        knots of the B-spline curve
+    rtol: float, optional
+        relative tolerance of the integral over each span
+    max_level: int, optional
+        maximum number of bisections of each span
+
+    Returns
+    =============
+    arclength: float
+        arclength of the curve between the first and the last knots
+    """
+    breakpoints = np.unique(knots)
+    lower, upper = breakpoints[:-1], breakpoints[1:]
+    integrals = _integrate_speed_on_intervals(db, lower, upper)
+
+    arclength = 0.0
+    for _ in range(max_level):
+        midpoints = 0.5 * (lower + upper)
+        lower = np.concatenate([lower, midpoints])
+        upper = np.concatenate([midpoints, upper])
+        half_integrals = _integrate_speed_on_intervals(db, lower, upper)
+        refined_integrals = half_integrals.reshape(2, -1).sum(axis=0)
+
+        converged = np.abs(refined_integrals - integrals) <= rtol * refined_integrals
+        arclength += refined_integrals[converged].sum()
+
+        # the halves of the unconverged spans are refined at the next level
+        unconverged = np.tile(~converged, 2)
+        lower, upper = lower[unconverged], upper[unconverged]
+        integrals = half_integrals[unconverged]
+        if integrals.size == 0:
+            break
+    else:
+        arclength += integrals.sum()
+
+    return arclength
+
+
 def fit_bspline_curve(
     arclength_parameters, coords, initial_knots, k=3, revised_ratio=0.9, tol=10 ** (-7)
 ):
@@ -61,21 +152,22 @@ def fit_bspline_curve(
 
 
     """
-    arclength_parameters_updated = arclength_parameters.copy()
-    knots = initial_knots.copy()
+    # inputs are validated once here; the arrays refitted in the loop
+    # are derived from them and need not be re-checked every iteration
+    arclength_parameters_updated = np.asarray_chkfinite(arclength_parameters).copy()
+    coords = np.asarray_chkfinite(coords)
+    knots = np.asarray_chkfinite(initial_knots).copy()
 
     arclength_ratio = 0
     while abs(1 - arclength_ratio) > tol:
         # b = make_lsq_spline(arclength_parameters_updated, coords, t=knots, k=k)
-        b = make_lsq_spline(arclength_parameters_updated, coords, k=k, t=knots)
-        db = b.derivative()
-        arclength, abserr = integrate.quad(
-            lambda l: np.linalg.norm(db(l)),
-            knots[0],
-            knots[-1],
-            points=knots,
-            limit=500,
+        b = make_lsq_spline(
+            arclength_parameters_updated, coords, k=k, t=knots, check_finite=False
         )
+        # the derivative is evaluated in the power basis,
+        # which costs one Horner step per node instead of the de Boor recursion
+        db = _bspline_to_ppoly(b).derivative()
+        arclength = _integrate_speed(db, knots)
 
         arclength_old = arclength_parameters_updated[-1]
         arclength_ratio = arclength / arclength_old
@@ -97,5 +189,50 @@ def fit_bspline_curve(
     return b, arclength_parameters_updated
 
 
+def _fit_bspline_curve_of_specimen(specimen, **kwargs):
+    arclength_parameters, coords, initial_knots = specimen
+    return fit_bspline_curve(arclength_parameters, coords, initial_knots, **kwargs)
+
+
+def fit_bspline_curves_batched(
+    specimens, k=3, revised_ratio=0.9, tol=10 ** (-7), max_workers=None
+):
+    """fit B-spline curves to the growth trajectories of multiple specimens
+    in parallel processes (see fit_bspline_curve)
+
+    Parameters
+    =============
+    specimens: iterable of tuples
+        (arclength_parameters, coords, initial_knots) of each specimen
+
+    k: int, optional
+        B-spline degree. Default is cubic, k=3.
+
+    revised_ratio: float, optional
+        fraction of the change in the arclength applied
+        to the arclength parameters in each iteration. Default is 0.9.
+
+    tol: float, optional
+        tolerance of the ratio of the arclength to the last arclength parameter
+        for terminating the iteration. Default is 10 ** (-7).
+
+    max_workers: int, optional
+        the maximum number of processes.
+        Default is the number of processors on the machine.
+
+    Returns
+    =============
+    results: list of tuples
+        (b, arclength_parameters_updated) of each specimen,
+        in the same order as specimens
+    """
+    fit = functools.partial(
+        _fit_bspline_curve_of_specimen, k=k, revised_ratio=revised_ratio, tol=tol
+    )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(fit, specimens))
+    return results
+
+
 def estimate_gt(arclength_parameters, thicknesses):
     return e, c, t, r0
@@ -1,6 +1,7 @@
 # ! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import itertools
 import re
 
 import numpy as np
@@ -9,67 +10,119 @@ import pandas as pd
 
 from ..growing_tube import estimate_gt_e_and_r0
 
+PRT_MV3D_LINES = re.compile(r"^#(\s+)Number(\s+)of(\s+)lines(\s+)(?P<line_num>[0-9]+)$")
+PRT_MV3D_PONTS = re.compile(
+    r"^#(\s+)Number(\s+)of(\s+)points(\s+)(?P<point_num>[0-9]+)$"
+)
+PRT_MV3D_INTER = re.compile(
+    r"^#(\s+)Number(\s+)of(\s+)inter.(\s+)(?P<inter_num>[0-9]+)$"
+)
 
-def _read_mv3d_as_df(filepath):
-    """
-    read a Microvisu3D file as pandas dataframe
 
+def _read_mv3d_table(filepath):
+    """
+    read the header and the data rows of a Microvisu3D file
+
+    Returns
+    =============
+    df_mv3d: pandas.DataFrame
+        parsed rows with the columns "no", "x", "y", "z", and "d"
+        and a sentinel column "extra" for a sixth field,
+        including malformed rows that must be dropped
+    is_data_row: 1D array of bool
+        whether each row consists of 5 fields
     """
-
-    PRT_MV3D_LINES = re.compile(
-        r"^#(\s+)Number(\s+)of(\s+)lines(\s+)(?P<line_num>[0-9]+)$"
-    )
-    PRT_MV3D_PONTS = re.compile(
-        r"^#(\s+)Number(\s+)of(\s+)points(\s+)(?P<point_num>[0-9]+)$"
-    )
-    PRT_MV3D_INTER = re.compile(
-        r"^#(\s+)Number(\s+)of(\s+)inter.(\s+)(?P<inter_num>[0-9]+)$"
-    )
-
     with open(filepath, "r") as f:
-        lines = f.readlines()
-    mv3d_lines = [line.replace("\n", "").split("\t") for line in lines]
-
-    m = PRT_MV3D_LINES.match(mv3d_lines[1][0])
+        mv3d_header_lines = [
+            line.replace("\n", "").split("\t") for line in itertools.islice(f, 7)
+        ]
+
+        # data rows are parsed by the C parser of pandas;
+        # comment lines and rows of more than 6 fields are skipped,
+        # and floats are converted exactly as float() does.
+        # the sentinel column "extra" catches a sixth field, and index_col=False
+        # keeps pandas from using the first column as the index
+        # when the first data row has more fields than the other rows
+        df_mv3d = pd.read_csv(
+            f,
+            sep="\t",
+            header=None,
+            names=["no", "x", "y", "z", "d", "extra"],
+            index_col=False,
+            dtype={"x": np.float64, "y": np.float64, "z": np.float64, "d": np.float64},
+            comment="#",
+            on_bad_lines="skip",
+            engine="c",
+            float_precision="round_trip",
+        )
+
+    m = PRT_MV3D_LINES.match(mv3d_header_lines[1][0])
     line_num = int(m["line_num"])
 
-    m = PRT_MV3D_PONTS.match(mv3d_lines[2][0])
+    m = PRT_MV3D_PONTS.match(mv3d_header_lines[2][0])
     point_num = int(m["point_num"])
 
-    m = PRT_MV3D_INTER.match(mv3d_lines[3][0])
+    m = PRT_MV3D_INTER.match(mv3d_header_lines[3][0])
     inter_num = int(m["inter_num"])
 
     print("line_num: ", line_num)
     print("point_num: ", point_num)
     print("inter_num: ", inter_num)
 
-    mv3d_data_lines = [line for line in mv3d_lines[7:] if len(line) == 5]
+    is_data_row = (
+        df_mv3d[["no", "x", "y", "z", "d"]].notna().all(axis=1)
+        & df_mv3d["extra"].isna()
+    ).to_numpy()
+    return df_mv3d, is_data_row
 
-    mv3d_data = [
-        [int(line[0]), float(line[1]), float(line[2]), float(line[3]), float(line[4])]
-        for line in mv3d_data_lines
-    ]
 
-    df_mv3d = pd.DataFrame(mv3d_data, columns=["no", "x", "y", "z", "d"])
+def _read_mv3d_as_df(filepath):
+    """
+    read a Microvisu3D file as pandas dataframe
+
+    """
+    df_mv3d, is_data_row = _read_mv3d_table(filepath)
+    df_mv3d = (
+        df_mv3d[is_data_row]
+        .drop(columns="extra")
+        .astype({"no": np.int64})
+        .reset_index(drop=True)
+    )
     return df_mv3d
 
 
+def _read_mv3d_as_arrays(filepath):
+    """
+    read coordinates and thicknesses in a Microvisu3D file as numpy arrays
+
+    Returns
+    =============
+    coords: 2D array, shape (n, 3)
+        coordinate values of the points
+    thicknesses: 1D array, shape (n,)
+        tube thickness at the points
+    """
+    df_mv3d, is_data_row = _read_mv3d_table(filepath)
+    mv3d_data = df_mv3d[["x", "y", "z", "d"]].to_numpy()
+    # boolean indexing copies the data rows into C-contiguous arrays
+    coords = mv3d_data[is_data_row, :3]
+    thicknesses = mv3d_data[is_data_row, 3]
+    return coords, thicknesses
+
+
 def _read_mv3d_as_growth_trajectory(filepath, adjust_direction_flag=True):
-    df_mv3d = _read_mv3d_as_df(filepath)
-    coords = df_mv3d[["x", "y", "z"]].to_numpy()
-    thicknesses = df_mv3d["d"].to_numpy()
-    arclength_parameters = np.append(
-        0, np.linalg.norm(coords[0:-1] - coords[1:], axis=1)
-    )
-    arclength_parameters = np.cumsum(arclength_parameters)
+    coords, thicknesses = _read_mv3d_as_arrays(filepath)
+    arclength_parameters = np.empty(len(coords))
+    arclength_parameters[0] = 0
+    arclength_parameters[1:] = np.linalg.norm(np.diff(coords, axis=0), axis=1)
+    np.cumsum(arclength_parameters, out=arclength_parameters)
 
     if adjust_direction_flag:
         e, r0 = estimate_gt_e_and_r0(arclength_parameters, thicknesses)
         if e < 0:
-            coords = coords[::-1]
-            thicknesses = thicknesses[::-1]
-            arclength_parameters = arclength_parameters[::-1]
-            arclength_parameters = -(arclength_parameters - arclength_parameters[0])
+            coords = np.ascontiguousarray(coords[::-1])
+            thicknesses = np.ascontiguousarray(thicknesses[::-1])
+            arclength_parameters = arclength_parameters[-1] - arclength_parameters[::-1]
     return coords, thicknesses, arclength_parameters
 
 
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from scipy import integrate
+from scipy.interpolate import make_lsq_spline
+
+from growing_tube_model_estimation.growing_tube import (
+    fit_bspline_curve,
+    fit_bspline_curves_batched,
+    gen_knots,
+)
+from growing_tube_model_estimation.growing_tube._growting_tube_estimation import (
+    _bspline_to_ppoly,
+    _integrate_speed,
+)
+
+
+def _fit_helix(k, num_knots):
+    arclength_parameters = np.linspace(0, 30, 1000)
+    coords = np.column_stack(
+        [
+            np.cos(arclength_parameters),
+            np.sin(arclength_parameters),
+            0.2 * arclength_parameters,
+        ]
+    )
+    knots = gen_knots(0, 30, num_knots, k + 1)
+    return make_lsq_spline(arclength_parameters, coords, k=k, t=knots)
+
+
+@pytest.mark.parametrize("k", [3, 6])
+def test_bspline_to_ppoly(k):
+    b = _fit_helix(k, 20)
+    pp = _bspline_to_ppoly(b)
+
+    # both ends are repeated knots
+    x = np.linspace(b.t[0], b.t[-1], 501)
+    np.testing.assert_allclose(pp(x), b(x), rtol=0, atol=1e-10)
+    np.testing.assert_allclose(
+        pp.derivative()(x), b.derivative()(x), rtol=0, atol=1e-10
+    )
+
+
+def test_integrate_speed_of_smooth_curve():
+    b = _fit_helix(3, 50)
+    db = b.derivative()
+
+    arclength = _integrate_speed(_bspline_to_ppoly(b).derivative(), b.t)
+
+    expected, _ = integrate.quad(
+        lambda l: np.linalg.norm(db(l)), b.t[0], b.t[-1], points=b.t, limit=500
+    )
+    assert arclength == pytest.approx(expected, rel=1e-10)
+
+
+def test_integrate_speed_of_curve_with_kink():
+    # the speed vanishes with a kink at l = cusp, inside a knot span
+    cusp = 0.3137
+    arclength_parameters = np.linspace(0, 1, 500)
+    coords = np.column_stack(
+        [
+            (arclength_parameters - cusp) ** 3,
+            (arclength_parameters - cusp) ** 2,
+            np.zeros_like(arclength_parameters),
+        ]
+    )
+    knots = gen_knots(0, 1, 5, 4)
+    b = make_lsq_spline(arclength_parameters, coords, k=3, t=knots)
+    db = b.derivative()
+
+    arclength = _integrate_speed(_bspline_to_ppoly(b).derivative(), knots)
+
+    expected, _ = integrate.quad(
+        lambda l: np.linalg.norm(db(l)),
+        0,
+        1,
+        points=[cusp],
+        limit=500,
+        epsabs=1e-14,
+    )
+    assert arclength == pytest.approx(expected, rel=1e-9)
+
+
+def test_fit_bspline_curves_batched_matches_fit_bspline_curve():
+    specimens = []
+    for seed in range(3):
+        rng = np.random.default_rng(seed)
+        s = np.linspace(0, 20, 2000)
+        coords = np.column_stack(
+            [np.exp(0.1 * s) * np.cos(s), np.exp(0.1 * s) * np.sin(s), 0.3 * s]
+        ) + rng.normal(0, 0.01, (s.size, 3))
+        arclength_parameters = np.append(
+            0, np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))
+        )
+        initial_knots = gen_knots(0, arclength_parameters[-1], 10, 4)
+        specimens.append((arclength_parameters, coords, initial_knots))
+
+    results = fit_bspline_curves_batched(specimens, max_workers=2)
+
+    assert len(results) == len(specimens)
+    for specimen, (b, arclength_parameters_updated) in zip(specimens, results):
+        b_expected, arclength_parameters_expected = fit_bspline_curve(*specimen)
+        np.testing.assert_array_equal(b.t, b_expected.t)
+        np.testing.assert_array_equal(b.c, b_expected.c)
+        np.testing.assert_array_equal(
+            arclength_parameters_updated, arclength_parameters_expected
+        )
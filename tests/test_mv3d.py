@@ -0,0 +1,76 @@
+import numpy as np
+
+from growing_tube_model_estimation.io import read_mv3d
+from growing_tube_model_estimation.io._mv3d import (
+    _read_mv3d_as_arrays,
+    _read_mv3d_as_df,
+)
+
+MV3D_HEADER = (
+    "#MicroVisu3D file\n"
+    "# Number of lines   1\n"
+    "# Number of points  6\n"
+    "# Number of inter.  0\n"
+    "#\n"
+    "# No\tx\ty\tz\td\n"
+    "#\n"
+)
+
+
+def test_readers_drop_the_same_malformed_rows(tmp_path):
+    filepath = tmp_path / "malformed.mv3d"
+    filepath.write_text(
+        MV3D_HEADER
+        + "1\t0.1\t0.2\t0.3\t1.0\n"
+        + "2\t0.4\t0.5\t0.6\t1.1\n"
+        + "\n"
+        + "# Line 2\n"
+        + "3\t0.7\t0.8\n"
+        + "4\t1\t2\t3\t4\t5\n"
+        + "5\t0.9\t1.0\t1.1\t1.2\n"
+    )
+
+    df_mv3d = _read_mv3d_as_df(filepath)
+    coords, thicknesses = _read_mv3d_as_arrays(filepath)
+
+    assert df_mv3d["no"].tolist() == [1, 2, 5]
+    np.testing.assert_array_equal(coords, df_mv3d[["x", "y", "z"]].to_numpy())
+    np.testing.assert_array_equal(thicknesses, df_mv3d["d"].to_numpy())
+
+
+def test_readers_drop_a_malformed_first_row(tmp_path):
+    filepath = tmp_path / "malformed_first_row.mv3d"
+    filepath.write_text(
+        MV3D_HEADER
+        + "9\t9\t9\t9\t9\t9\n"
+        + "1\t0.1\t0.2\t0.3\t1.0\n"
+        + "2\t0.4\t0.5\t0.6\t1.1\n"
+    )
+
+    df_mv3d = _read_mv3d_as_df(filepath)
+    coords, thicknesses = _read_mv3d_as_arrays(filepath)
+
+    assert df_mv3d.columns.tolist() == ["no", "x", "y", "z", "d"]
+    assert df_mv3d["no"].tolist() == [1, 2]
+    np.testing.assert_array_equal(coords, np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]))
+    np.testing.assert_array_equal(thicknesses, np.array([1.0, 1.1]))
+
+
+def test_growth_trajectory_is_c_contiguous_in_both_directions(tmp_path):
+    for direction in [1, -1]:
+        filepath = tmp_path / "trajectory.mv3d"
+        filepath.write_text(
+            MV3D_HEADER
+            + "".join(
+                f"{i}\t{i}\t{0.5 * i}\t0.0\t{1.0 + 0.1 * direction * i}\n"
+                for i in range(6)
+            )
+        )
+
+        coords, thicknesses, arclength_parameters = read_mv3d(
+            filepath, read_as="growth_trajectory"
+        )
+
+        assert coords.flags["C_CONTIGUOUS"]
+        assert thicknesses.flags["C_CONTIGUOUS"]
+        assert arclength_parameters.flags["C_CONTIGUOUS"]